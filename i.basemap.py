@@ -79,6 +79,22 @@
 #% description: Number of color levels per RGB channel used by r.composite (256 = lossless for 8-bit imagery)
 #%end
 
+#%option
+#% key: workers
+#% type: integer
+#% required: no
+#% options: 1-64
+#% answer: 8
+#% description: Number of tiles to download in parallel
+#%end
+
+#%option
+#% key: cache_dir
+#% type: string
+#% required: no
+#% description: Directory for cached tiles used with -k (default: i.basemap in the user's cache directory)
+#%end
+
 #%flag
 #% key: l
 #% description: List available web map servers
@@ -104,13 +120,28 @@
 #% description: Keep separate red/green/blue band maps instead of a single composite
 #%end
 
+#%flag
+#% key: k
+#% description: Cache downloaded tiles and reuse them in later runs
+#%end
+
 import sys
 import os
+import io
 import math
-import subprocess
 import tempfile
-import random
-from osgeo import gdal
+import hashlib
+import json
+import time
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+from osgeo import gdal, osr
+import urllib3
+from urllib3.util.retry import Retry
+
+gdal.UseExceptions()
 
 # Try to import grass.script
 try:
@@ -120,6 +151,31 @@ except ImportError:
     GRASS_AVAILABLE = False
     gs = None
 
+# Upper bound on simultaneous requests to a single tile host, independent of
+# the number of download workers. Most public tile servers (OSM, Bing, Google)
+# ask clients to keep this low.
+MAX_CONNECTIONS_PER_HOST = 8
+
+# Number of completed tiles between download progress messages
+PROGRESS_INTERVAL = 32
+
+# Subdomains substituted for {s} in sharded tile URLs (Stamen, OSM France)
+TILE_SUBDOMAINS = ('a', 'b', 'c')
+
+# Cached tiles younger than this (seconds) are reused without contacting
+# the server; older ones are revalidated with a conditional request
+CACHE_MAX_AGE = 7 * 24 * 3600
+
+# Smallest file size accepted as a cached tile (a minimal valid PNG)
+MIN_TILE_SIZE = 67
+
+# Read size for streamed tile downloads. Large enough to hold a typical
+# 256x256 tile in one read, and always enough for the image signature check.
+TILE_CHUNK_SIZE = 64 * 1024
+
+# Width and height in pixels of XYZ/quadkey tiles
+TILE_SIZE = 256
+
 # Web map server configurations - 25 Comprehensive Data Sources
 WEB_MAP_SERVERS = {
     'Google_Satellite': {
@@ -301,17 +357,20 @@ WEB_MAP_SERVERS = {
 
 def list_servers():
     """List all available web map servers"""
-    gs.message("=" * 80)
-    gs.message("Available Web Map Servers:")
-    gs.message("=" * 80)
+    buf = io.StringIO()
+    buf.write("=" * 80 + "\n")
+    buf.write("Available Web Map Servers:\n")
+    buf.write("=" * 80 + "\n")
     for server_id, server_info in WEB_MAP_SERVERS.items():
-        gs.message(f"  {server_id}: {server_info['name']}")
-        gs.message(f"    URL: {server_info['url']}")
-        gs.message(f"    Type: {server_info['type']}")
-        gs.message(f"    Max Zoom: {server_info['max_zoom']}")
-        gs.message(f"    Format: {server_info['format']}")
-        gs.message("")
-    gs.message("=" * 80)
+        buf.write(f"  {server_id}: {server_info['name']}\n")
+        buf.write(f"    URL: {server_info['url']}\n")
+        buf.write(f"    Type: {server_info['type']}\n")
+        buf.write(f"    Max Zoom: {server_info['max_zoom']}\n")
+        buf.write(f"    Format: {server_info['format']}\n")
+        buf.write("\n")
+    buf.write("=" * 80)
+    # One message for the whole listing instead of one g.message per line
+    gs.message(buf.getvalue())
 
 def get_server_url(server_name, layer=None, api_key=None):
     """Get the appropriate URL for the server"""
@@ -321,22 +380,97 @@ def get_server_url(server_name, layer=None, api_key=None):
     server = WEB_MAP_SERVERS[server_name]
     return server['url']
 
+def _spread_bits(v):
+    """Insert a zero bit between each of the low 32 bits of v"""
+    v &= 0xFFFFFFFF
+    v = (v | (v << 16)) & 0x0000FFFF0000FFFF
+    v = (v | (v << 8)) & 0x00FF00FF00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F0F0F0F0F
+    v = (v | (v << 2)) & 0x3333333333333333
+    v = (v | (v << 1)) & 0x5555555555555555
+    return v
+
 def xyz_to_quadkey(x, y, zoom):
-    """Convert XYZ tile coordinates to Bing quadkey format"""
-    quadkey = ""
-    for i in range(zoom, 0, -1):
-        digit = 0
-        mask = 1 << (i - 1)
-        if (x & mask) != 0:
-            digit += 1
-        if (y & mask) != 0:
-            digit += 2
-        quadkey += str(digit)
-    return quadkey
-
-def get_region_bounds():
-    """Get current region bounds"""
-    region = gs.region()
+    """Convert XYZ tile coordinates to Bing quadkey format
+
+    A quadkey is the Morton (bit-interleaved) code of x and y written in
+    base 4, one digit per zoom level.
+    """
+    if zoom == 0:
+        return ""
+    morton = _spread_bits(int(x)) | (_spread_bits(int(y)) << 1)
+    return np.base_repr(morton, base=4).zfill(zoom)
+
+@functools.lru_cache(maxsize=16)
+def _get_transformer(src_crs, dst_crs):
+    """Return a reusable pyproj Transformer between two CRS definitions
+
+    Building a transformer parses the CRS definitions and sets up the PROJ
+    pipeline, so it is created once per CRS pair and shared afterwards.
+    """
+    import pyproj
+    return pyproj.Transformer.from_crs(src_crs, dst_crs, always_xy=True)
+
+def is_image_header(data):
+    """Check whether bytes start with a PNG, JPEG or GIF signature"""
+    return (data.startswith(b'\x89PNG') or
+            data.startswith(b'\xFF\xD8\xFF') or
+            data.startswith(b'GIF8'))
+
+def read_tile_rgb(tile_file):
+    """Decode a tile into a (3, TILE_SIZE, TILE_SIZE) uint8 RGB array
+
+    Paletted tiles are expanded through their color table, grayscale tiles
+    are replicated to all three bands and alpha bands are dropped.
+    """
+    ds = gdal.Open(tile_file)
+    data = ds.ReadAsArray(buf_xsize=TILE_SIZE, buf_ysize=TILE_SIZE)
+    if data.ndim == 2:
+        color_table = ds.GetRasterBand(1).GetColorTable()
+        if color_table is not None:
+            lut = np.zeros((256, 3), dtype=np.uint8)
+            for i in range(min(color_table.GetCount(), 256)):
+                lut[i] = color_table.GetColorEntry(i)[:3]
+            return lut[data].transpose(2, 0, 1)
+        data = data[np.newaxis]
+    if data.shape[0] < 3:
+        data = np.repeat(data[:1], 3, axis=0)
+    return data[:3].astype(np.uint8, copy=False)
+
+def remove_tile_dir(path):
+    """Remove a flat directory of downloaded tiles
+
+    Tile directories hold no subdirectories, so a single os.scandir pass is
+    enough; unlike shutil.rmtree it does not walk or stat a tree.
+    """
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+    try:
+        os.rmdir(path)
+    except OSError:
+        pass
+
+def default_cache_dir():
+    """Return the per-user tile cache directory
+
+    Uses %LOCALAPPDATA% on Windows and $XDG_CACHE_HOME (default ~/.cache)
+    elsewhere, so that the cache is never shared between users.
+    """
+    if sys.platform == 'win32' and os.environ.get('LOCALAPPDATA'):
+        base = os.environ['LOCALAPPDATA']
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+            os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'i.basemap')
+
+def get_region_bounds(region=None):
+    """Get current region bounds, optionally from an already-read region"""
+    if region is None:
+        region = gs.region()
     
     return {
         'minx': region['w'],
@@ -345,30 +479,29 @@ def get_region_bounds():
         'maxy': region['n']
     }
 
-def download_xyz_tiles(url_template, bbox, output, maxcols, maxrows, srs, format):
+def download_xyz_tiles(url_template, bbox, output, maxcols, maxrows, srs, format,
+                       workers=8, region=None, cache_dir=None):
     """Download XYZ tiles and create a raster map"""
     import tempfile
     import os
     import math
-    import subprocess
-    import random
     
     gs.message("Downloading XYZ tiles - this may take a while...")
     gs.message(f"Input bbox: {bbox}")
     
+    # Region and projection are invariant for the whole run; read them once
+    # instead of spawning g.region/g.proj again wherever they are needed
+    if region is None:
+        region = gs.region()
+    proj_info = gs.parse_command('g.proj', flags='j')
+
     # Calculate appropriate zoom level based on region resolution
     zoom_level = 12  # Default zoom level
     
     # Transform projected coordinates to lat/lon if needed
-    def transform_to_latlon(bbox):
+    def transform_to_latlon(bbox, proj_info):
         """Transform projected coordinates to lat/lon using pyproj"""
         try:
-            import pyproj
-            
-            # Get current GRASS projection info
-            region = gs.region()
-            proj_info = gs.parse_command('g.proj', flags='j')
-            
             # Create transformer from current projection to WGS84 (EPSG:4326)
             if '+proj' in proj_info:
                 # Extract projection parameters
@@ -383,17 +516,25 @@ def download_xyz_tiles(url_template, bbox, output, maxcols, maxrows, srs, format
                 src_crs = "EPSG:3857"
             
             # Create coordinate transformer
-            transformer = pyproj.Transformer.from_crs(src_crs, "EPSG:4326", always_xy=True)
+            transformer = _get_transformer(src_crs, "EPSG:4326")
             
-            # Transform bbox corners
-            min_lon, min_lat = transformer.transform(bbox['minx'], bbox['miny'])
-            max_lon, max_lat = transformer.transform(bbox['maxx'], bbox['maxy'])
+            # Transform points along all four bbox edges, not just two
+            # corners: away from the projection's central meridian the
+            # region is rotated in lat/lon and its NW/SE corners stick out
+            steps = np.linspace(0.0, 1.0, 21)
+            edge_x = bbox['minx'] + steps * (bbox['maxx'] - bbox['minx'])
+            edge_y = bbox['miny'] + steps * (bbox['maxy'] - bbox['miny'])
+            xs = np.concatenate([edge_x, edge_x, np.full_like(edge_y, bbox['minx']),
+                                 np.full_like(edge_y, bbox['maxx'])])
+            ys = np.concatenate([np.full_like(edge_x, bbox['miny']),
+                                 np.full_like(edge_x, bbox['maxy']), edge_y, edge_y])
+            lons, lats = transformer.transform(xs, ys)
             
             return {
-                'minx': min_lon,
-                'miny': min_lat, 
-                'maxx': max_lon,
-                'maxy': max_lat
+                'minx': float(np.min(lons)),
+                'miny': float(np.min(lats)),
+                'maxx': float(np.max(lons)),
+                'maxy': float(np.max(lats))
             }
         except ImportError:
             gs.fatal("pyproj is required for coordinate transformation. "
@@ -402,14 +543,18 @@ def download_xyz_tiles(url_template, bbox, output, maxcols, maxrows, srs, format
             gs.warning(f"Coordinate transformation failed: {str(e)}")
             return bbox
     
-    # Convert bbox to lat/lon if needed
-    if abs(bbox['minx']) > 180 or abs(bbox['maxx']) > 180:
+    # Convert bbox to lat/lon if needed. Decide from the location's CRS;
+    # the coordinate range is only a fallback for locations without one.
+    if '+proj' in proj_info:
+        needs_transform = proj_info['+proj'] != 'longlat'
+    else:
+        needs_transform = abs(bbox['minx']) > 180 or abs(bbox['maxx']) > 180
+    if needs_transform:
         gs.message("Transforming coordinates from projected to lat/lon...")
-        bbox = transform_to_latlon(bbox)
+        bbox = transform_to_latlon(bbox, proj_info)
         gs.message(f"Transformed bbox: {bbox}")
     
     # Dynamic zoom level calculation based on region resolution
-    region = gs.region()
     avg_resolution = (region['nsres'] + region['ewres']) / 2
     
     # Adjust thresholds to ensure 30m resolution uses zoom 13
@@ -428,23 +573,6 @@ def download_xyz_tiles(url_template, bbox, output, maxcols, maxrows, srs, format
     
     gs.message(f"Region resolution: {avg_resolution:.1f}m, using zoom level {zoom_level} for cleaner imagery")
     
-    # Expand bbox by 10% in all directions to ensure complete coverage
-    def expand_bbox(bbox, expansion_factor=0.1):
-        """Expand bounding box by given factor in all directions"""
-        width = bbox['maxx'] - bbox['minx']
-        height = bbox['maxy'] - bbox['miny']
-        
-        return {
-            'minx': bbox['minx'] - width * expansion_factor,
-            'miny': bbox['miny'] - height * expansion_factor,
-            'maxx': bbox['maxx'] + width * expansion_factor,
-            'maxy': bbox['maxy'] + height * expansion_factor
-        }
-    
-    original_bbox = bbox.copy()
-    bbox = expand_bbox(bbox)
-    gs.message(f"Expanded bbox: {bbox}")
-    
     # Convert bbox coordinates to Web Mercator (EPSG:3857) if needed
     # For now, assume input coordinates are in lat/lon
     def deg2num(lat_deg, lon_deg, zoom):
@@ -455,50 +583,84 @@ def download_xyz_tiles(url_template, bbox, output, maxcols, maxrows, srs, format
         return (xtile, ytile)
     
     def num2deg(xtile, ytile, zoom):
+        """Convert tile coordinates to lon/lat; accepts scalars or NumPy arrays"""
         n = 2.0 ** zoom
-        lon_deg = xtile / n * 360.0 - 180.0
-        lat_rad = math.atan(math.sinh(math.pi * (1 - 2 * ytile / n)))
-        lat_deg = math.degrees(lat_rad)
+        lon_deg = np.asarray(xtile) / n * 360.0 - 180.0
+        lat_rad = np.arctan(np.sinh(np.pi * (1 - 2 * np.asarray(ytile) / n)))
+        lat_deg = np.degrees(lat_rad)
         return (lon_deg, lat_deg)
 
     def num2merc(xtile, ytile, zoom):
         """Convert tile coordinates to Web Mercator (EPSG:3857) meters"""
         lon_deg, lat_deg = num2deg(xtile, ytile, zoom)
         merc_x = lon_deg * 20037508.34 / 180.0
-        merc_y = math.log(math.tan((90.0 + lat_deg) * math.pi / 360.0)) / (math.pi / 180.0)
+        merc_y = np.log(np.tan((90.0 + lat_deg) * np.pi / 360.0)) / (np.pi / 180.0)
         merc_y = merc_y * 20037508.34 / 180.0
         return (merc_x, merc_y)
 
-    def create_world_file(world_file, x, y, zoom):
-        """Create a world file (.wld) for an XYZ tile in Web Mercator coordinates
+    def read_cache_validators(cache_file):
+        """Build conditional request headers from a cached tile's sidecar"""
+        try:
+            with open(cache_file + '.json') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def remove_partial_file(path):
+        """Remove a partially written tile, if any"""
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
 
-        XYZ tiles are natively served in Web Mercator (EPSG:3857), so the
-        world file must be georeferenced in that CRS to match the tile
-        pixel grid. Reprojection to the current GRASS location happens
-        later, on import.
+    def write_cache_validators(cache_file, response, request_headers=None):
+        """Store a tile's ETag/Last-Modified next to it for revalidation
+
+        Validators missing from the response are kept from request_headers,
+        the conditional headers the response answers.
         """
-        # Get Web Mercator coordinates of tile corners
-        min_merc_x, max_merc_y = num2merc(x, y, zoom)
-        max_merc_x, min_merc_y = num2merc(x + 1, y + 1, zoom)
-
-        # World file format (6 lines):
-        # Assuming 256x256 pixel tiles
-        pixel_size_x = (max_merc_x - min_merc_x) / 256
-        pixel_size_y = (max_merc_y - min_merc_y) / 256
-
-        with open(world_file, 'w') as f:
-            f.write(f"{pixel_size_x}\n")  # Line 1: pixel width
-            f.write("0\n")              # Line 2: rotation y
-            f.write("0\n")              # Line 3: rotation x
-            f.write(f"{-pixel_size_y}\n") # Line 4: pixel height (negative)
-            f.write(f"{min_merc_x}\n")   # Line 5: x-coordinate of upper-left pixel center
-            f.write(f"{max_merc_y}\n")   # Line 6: y-coordinate of upper-left pixel center
-    
+        request_headers = request_headers or {}
+        meta = {'etag': response.headers.get('ETag',
+                                             request_headers.get('If-None-Match')),
+                'last_modified': response.headers.get(
+                    'Last-Modified', request_headers.get('If-Modified-Since'))}
+        fd, part_file = tempfile.mkstemp(dir=os.path.dirname(cache_file),
+                                         suffix='.part')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(meta, f)
+            os.replace(part_file, cache_file + '.json')
+        except BaseException:
+            remove_partial_file(part_file)
+            raise
+
+    def update_cache_validators(cache_file, response, request_headers=None):
+        """Write a tile's sidecar without failing the tile
+
+        The tile data is already in the cache at this point. If the sidecar
+        cannot be written, the outdated one is removed so that it can never
+        vouch for the new data, and the tile is only refetched
+        unconditionally once it is stale.
+        """
+        try:
+            write_cache_validators(cache_file, response, request_headers)
+        except OSError:
+            sidecar_failures.append(cache_file)
+            remove_partial_file(cache_file + '.json')
+
     # Get tile coordinates for bbox with overlap
     min_x, min_y = deg2num(bbox['maxy'], bbox['minx'], zoom_level)
     max_x, max_y = deg2num(bbox['miny'], bbox['maxx'], zoom_level)
     
-    # Add overlap buffer (1 extra tile around the edges)
+    # Add overlap buffer (1 extra tile around the edges). The bbox already
+    # covers the whole region outline, so this is all the margin needed.
     overlap = 1
     min_x = max(0, min_x - overlap)
     max_x = min(2**zoom_level - 1, max_x + overlap)
@@ -507,166 +669,289 @@ def download_xyz_tiles(url_template, bbox, output, maxcols, maxrows, srs, format
     
     gs.message(f"Limited tile range: X({min_x}-{max_x}), Y({min_y}-{max_y})")
     
-    # Create temporary directory for tiles
-    temp_dir = tempfile.mkdtemp()
-    tile_files = []
+    # With the cache enabled, tiles are decoded straight from the cache and
+    # only the mosaic is temporary; otherwise tiles go to a temporary
+    # directory that is removed at the end
+    temp_dir = None if cache_dir else tempfile.mkdtemp()
+    mosaic = None
+    mosaic_file = None
+    tiles = []
+    # Cached tiles whose revalidation sidecar could not be written; filled
+    # from the download threads (list.append is atomic)
+    sidecar_failures = []
     
     try:
-        # Create list of all tile coordinates and randomize order
-        tile_coords = []
-        for x in range(min_x, max_x + 1):
-            for y in range(min_y, max_y + 1):
-                tile_coords.append((x, y))
+        # Build all tile coordinates as an (N, 2) array and randomize order
+        xs, ys = np.meshgrid(np.arange(min_x, max_x + 1),
+                             np.arange(min_y, max_y + 1), indexing='ij')
+        tile_coords = np.stack([xs.ravel(), ys.ravel()], axis=1)
         
         # Randomize tile download order
-        random.shuffle(tile_coords)
+        np.random.default_rng().shuffle(tile_coords, axis=0)
         gs.message(f"Randomized download order for {len(tile_coords)} tiles")
         
-        # Download tiles using curl with retry logic
+        # Download tiles concurrently over a shared, thread-safe connection
+        # pool. It keeps TCP/TLS connections alive between tiles and retries
+        # transient server errors with backoff. The pool blocks at
+        # MAX_CONNECTIONS_PER_HOST, so extra workers only help when tiles
+        # are spread over several hosts.
         max_retries = 2
-        for x, y in tile_coords:
-            # Handle different URL formats (XYZ vs quadkey)
+        http = urllib3.PoolManager(
+            num_pools=4,
+            maxsize=MAX_CONNECTIONS_PER_HOST,
+            block=True,
+            retries=Retry(total=max_retries, backoff_factor=0.3,
+                          status_forcelist=[429, 500, 502, 503, 504]))
+        timeout = urllib3.Timeout(connect=10, read=30)
+
+        def fetch_tile(x, y):
+            """Fetch a single tile, from the cache or the server
+
+            Runs in a worker thread, so it only reports back to the caller
+            instead of emitting GRASS messages itself. Returns a
+            (tile_file, size, error, cached) tuple where error is None on
+            success.
+            """
+            cache_file = None
+            request_headers = {}
+            stale_tile = False
+
+            def use_cached_tile():
+                return cache_file, os.path.getsize(cache_file), None, True
+
+            def fail(error):
+                # A stale but valid cached copy beats no tile at all, e.g.
+                # when working offline or the server is rate limiting
+                if stale_tile:
+                    return use_cached_tile()
+                return tile_file, 0, error, False
+
+            if cache_dir:
+                cache_file = os.path.join(cache_dir, str(zoom_level), str(x),
+                                          f"{y}.{format}")
+                tile_file = cache_file
+                # Cached tiles were validated before being written, so a
+                # stat is enough to tell whether a usable copy exists
+                try:
+                    cache_stat = os.stat(cache_file)
+                except OSError:
+                    cache_stat = None
+                if cache_stat and cache_stat.st_size >= MIN_TILE_SIZE:
+                    if time.time() - cache_stat.st_mtime < CACHE_MAX_AGE:
+                        return use_cached_tile()
+                    # Stale: ask the server whether the tile changed
+                    stale_tile = True
+                    request_headers = read_cache_validators(cache_file)
+            else:
+                tile_file = os.path.join(temp_dir, f"tile_{x}_{y}.{format}")
+
+            # Handle different URL formats (XYZ vs quadkey). Servers with
+            # a {s} placeholder are sharded over subdomains; picking it from
+            # the tile position spreads requests over all hosts while each
+            # tile always maps to the same URL.
+            subdomain = TILE_SUBDOMAINS[(x + y) % len(TILE_SUBDOMAINS)]
             if '{quadkey}' in url_template:
                 quadkey = xyz_to_quadkey(x, y, zoom_level)
-                tile_url = url_template.format(quadkey=quadkey)
+                tile_url = url_template.format(quadkey=quadkey, s=subdomain)
             else:
-                tile_url = url_template.format(z=zoom_level, x=x, y=y)
-            
-            tile_file = os.path.join(temp_dir, f"tile_{x}_{y}.{format}")
-            
-            # Retry logic for failed downloads
-            for attempt in range(max_retries + 1):
-                success = False
-                try:
-                    gs.message(f"Downloading tile URL: {tile_url} (attempt {attempt + 1})")
-                    result = subprocess.run(['curl', '-s', '-o', tile_file, tile_url, '--connect-timeout', '10', '--max-time', '30'], 
-                                          capture_output=True, text=True)
-                    
-                    # Validate downloaded tile
-                    if result.returncode == 0 and os.path.exists(tile_file):
-                        file_size = os.path.getsize(tile_file)
-                        if file_size > 0:
-                            # Quick validation - check if it's a valid image
-                            try:
-                                with open(tile_file, 'rb') as f:
-                                    header = f.read(10)
-                                    if len(header) >= 4 and (header.startswith(b'\x89PNG') or 
-                                                          header.startswith(b'\xFF\xD8\xFF') or 
-                                                          header.startswith(b'GIF8')):
-                                        # Valid image - create world file
-                                        world_file = tile_file.replace('.png', '.wld').replace('.jpeg', '.wld')
-                                        create_world_file(world_file, x, y, zoom_level)
-                                        tile_files.append(tile_file)
-                                        gs.message(f"Successfully downloaded tile {x},{y} ({file_size} bytes)")
-                                        success = True
-                                        break  # Success, exit retry loop
-                                    else:
-                                        gs.warning(f"Tile {x},{y} is not a valid image file (attempt {attempt + 1})")
-                                        if os.path.exists(tile_file):
-                                            os.remove(tile_file)
-                            except Exception as e:
-                                gs.warning(f"Error validating tile {x},{y}: {str(e)} (attempt {attempt + 1})")
-                                if os.path.exists(tile_file):
-                                    os.remove(tile_file)
-                        else:
-                            gs.warning(f"Tile {x},{y} is empty (0 bytes) (attempt {attempt + 1})")
-                            if os.path.exists(tile_file):
-                                os.remove(tile_file)
-                    else:
-                        gs.warning(f"Failed to download tile {x},{y}. Return code: {result.returncode} (attempt {attempt + 1})")
-                        if result.stderr:
-                            gs.warning(f"Curl error: {result.stderr.decode()}")
-                        if os.path.exists(tile_file):
-                            os.remove(tile_file)
-                    
-                    # If this was the last attempt and still failed, give up
-                    if attempt == max_retries and not success:
-                        gs.warning(f"Tile {x},{y} failed after {max_retries + 1} attempts - skipping")
-                        
-                except Exception as e:
-                    gs.warning(f"Error downloading tile {x},{y}: {str(e)} (attempt {attempt + 1})")
-                    if os.path.exists(tile_file):
-                        os.remove(tile_file)
-                    
-                    # Last attempt failed
-                    if attempt == max_retries:
-                        gs.warning(f"Tile {x},{y} failed after {max_retries + 1} attempts - skipping")
-        
-        if not tile_files:
-            gs.fatal("No tiles were downloaded successfully")
-        
-        gs.message(f"Downloaded {len(tile_files)} tiles")
-        
+                tile_url = url_template.format(z=zoom_level, x=x, y=y, s=subdomain)
+
+            # Stream the response: the signature is checked on the first
+            # chunk in memory so that invalid tiles never touch the disk
+            try:
+                response = http.request('GET', tile_url, timeout=timeout,
+                                        headers=request_headers,
+                                        preload_content=False)
+            except urllib3.exceptions.HTTPError as e:
+                return fail(f"request failed: {e}")
+            target_file = None
+            try:
+                if response.status == 304 and stale_tile:
+                    # Not modified: refresh the cached copy's age and its
+                    # validators, if the server sent new ones, and reuse it
+                    try:
+                        os.utime(cache_file)
+                    except OSError:
+                        pass
+                    if ('ETag' in response.headers or
+                            'Last-Modified' in response.headers):
+                        update_cache_validators(cache_file, response,
+                                                request_headers)
+                    return use_cached_tile()
+                if response.status != 200:
+                    return fail(f"HTTP status {response.status}")
+                if response.headers.get('Content-Length') == '0':
+                    return fail("empty response (0 bytes)")
+
+                chunk = response.read(TILE_CHUNK_SIZE)
+                if not chunk:
+                    return fail("empty response (0 bytes)")
+                # Quick validation - check if it's a valid image
+                if not is_image_header(chunk):
+                    return fail("not a valid image file")
+
+                if cache_file:
+                    # Write to the cache atomically so that concurrent or
+                    # interrupted runs never see a partial tile
+                    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+                    fd, target_file = tempfile.mkstemp(
+                        dir=os.path.dirname(cache_file), suffix='.part')
+                    f = os.fdopen(fd, 'wb')
+                else:
+                    target_file = tile_file
+                    f = open(target_file, 'wb')
+                size = 0
+                with f:
+                    while chunk:
+                        f.write(chunk)
+                        size += len(chunk)
+                        chunk = response.read(TILE_CHUNK_SIZE)
+                if cache_file:
+                    os.replace(target_file, cache_file)
+            except urllib3.exceptions.HTTPError as e:
+                remove_partial_file(target_file)
+                return fail(f"request failed: {e}")
+            except BaseException:
+                # Never leave a partial tile behind, e.g. on a full disk
+                remove_partial_file(target_file)
+                raise
+            finally:
+                # Discard any unread body so the connection can be reused
+                response.drain_conn()
+                response.release_conn()
+
+            if cache_file:
+                update_cache_validators(cache_file, response)
+            return tile_file, size, None, False
+
         # Real-world Web Mercator extent of the tile grid (not tile indices)
         merc_min_x, merc_max_y = num2merc(min_x, min_y, zoom_level)
         merc_max_x, merc_min_y = num2merc(max_x + 1, max_y + 1, zoom_level)
 
         # Web Mercator tiles are equal-sized in projected meters at a given zoom
         earth_circumference = 2 * math.pi * 6378137.0
-        pixel_size = (earth_circumference / (2 ** zoom_level)) / 256
+        pixel_size = (earth_circumference / (2 ** zoom_level)) / TILE_SIZE
 
-        # Create a VRT file from the tiles using gdalbuildvrt
-        vrt_file = os.path.join(temp_dir, "tiles.vrt")
+        # Tiles are decoded straight into a single GeoTIFF so that r.import
+        # reads one contiguous file instead of opening every tile through a
+        # VRT. Each tile is written at its offset as soon as it is decoded,
+        # so memory use does not grow with the size of the region.
+        n_cols = (max_x - min_x + 1) * TILE_SIZE
+        n_rows = (max_y - min_y + 1) * TILE_SIZE
+        with tempfile.NamedTemporaryFile(suffix='.tif', delete=False) as f:
+            mosaic_file = f.name
+        mosaic_srs = osr.SpatialReference()
+        mosaic_srs.ImportFromEPSG(3857)
         try:
-            # Create VRT with blending to reduce tile seams
-            cmd = [
-                'gdalbuildvrt',
-                '-a_srs', 'EPSG:3857',
-                '-resolution', 'user',
-                '-te', str(merc_min_x), str(merc_min_y), str(merc_max_x), str(merc_max_y),
-                '-tr', str(pixel_size), str(pixel_size),
-                vrt_file
-            ] + tile_files
-
-            subprocess.run(cmd, check=True, capture_output=True)
-
-            # Tag band color interpretation explicitly. gdalbuildvrt/gdal_translate
-            # don't reliably propagate Red/Green/Blue from source PNG/JPEG tiles,
-            # which otherwise makes r.import/r.in.gdal fall back to naming bands
-            # <output>.1/.2/.3 instead of <output>.red/.green/.blue.
-            band_colors = ['red', 'green', 'blue', 'alpha']
-            n_bands = gdal.Open(vrt_file).RasterCount
-            colorinterp = band_colors[:n_bands]
-
-            # Apply cubic resampling to reduce seams
-            final_vrt = os.path.join(temp_dir, "tiles_final.vrt")
-            translate_cmd = [
-                'gdal_translate',
-                '-of', 'VRT',
-                '-r', 'cubic',
-                '-a_nodata', '0',
-                '-colorinterp', ','.join(colorinterp),
-                vrt_file, final_vrt
-            ]
-            subprocess.run(translate_cmd, check=True, capture_output=True)
-
-        except subprocess.CalledProcessError as e:
-            gs.warning(f"Advanced VRT creation failed: {e}")
-            # Fallback: try simple gdalbuildvrt, then stamp the SRS and band
-            # colors on afterwards
+            mosaic = gdal.GetDriverByName('GTiff').Create(
+                mosaic_file, n_cols, n_rows, 3, gdal.GDT_Byte,
+                options=['TILED=YES', 'COMPRESS=DEFLATE',
+                         f'BLOCKXSIZE={TILE_SIZE}', f'BLOCKYSIZE={TILE_SIZE}'])
+            mosaic.SetGeoTransform((merc_min_x, pixel_size, 0, merc_max_y, 0, -pixel_size))
+            mosaic.SetProjection(mosaic_srs.ExportToWkt())
+            # Tag band color interpretation explicitly so that
+            # r.import/r.in.gdal name bands <output>.red/.green/.blue
+            # instead of <output>.1/.2/.3
+            band_colors = [gdal.GCI_RedBand, gdal.GCI_GreenBand, gdal.GCI_BlueBand]
+            for i, color in enumerate(band_colors, start=1):
+                band = mosaic.GetRasterBand(i)
+                band.SetNoDataValue(0)
+                band.SetColorInterpretation(color)
+        except RuntimeError as e:
+            gs.fatal(f"Failed to create tile mosaic: {e}")
+        mosaic_lock = threading.Lock()
+
+        def paste_tile(x, y, tile_file):
+            """Decode a tile and write it at its place in the mosaic
+
+            Runs in a decoder thread. Decoding runs in parallel; writes to
+            the shared GDAL dataset are serialized by mosaic_lock.
+            """
+            data = read_tile_rgb(tile_file)
+            row = int(y - min_y) * TILE_SIZE
+            col = int(x - min_x) * TILE_SIZE
+            with mosaic_lock:
+                for i in range(3):
+                    mosaic.GetRasterBand(i + 1).WriteArray(data[i], col, row)
+
+        gs.message(f"Downloading with {workers} parallel workers")
+        # Decoding starts as soon as each tile arrives, overlapping with the
+        # remaining downloads. GDAL releases the GIL while decoding.
+        with ThreadPoolExecutor(max_workers=workers) as executor, \
+                ThreadPoolExecutor(max_workers=os.cpu_count()) as decoder:
             try:
-                subprocess.run(['gdalbuildvrt', '-a_srs', 'EPSG:3857', vrt_file] + tile_files, check=True)
-                band_colors = ['red', 'green', 'blue', 'alpha']
-                n_bands = gdal.Open(vrt_file).RasterCount
-                for i, color in enumerate(band_colors[:n_bands], start=1):
-                    subprocess.run(['gdal_edit.py', '-colorinterp_' + str(i), color, vrt_file], check=True)
-                final_vrt = vrt_file
-            except subprocess.CalledProcessError:
-                gs.fatal("Failed to create VRT from tiles. gdalbuildvrt may not be available.")
-
-        # Import VRT into GRASS using r.import, which reprojects the
+                futures = {executor.submit(fetch_tile, x, y): (x, y)
+                           for x, y in tile_coords}
+                decode_futures = {}
+                # Per-tile details are only shown with --verbose; otherwise report
+                # progress every PROGRESS_INTERVAL tiles
+                for done, future in enumerate(as_completed(futures), start=1):
+                    x, y = futures[future]
+                    try:
+                        tile_file, file_size, error, cached = future.result()
+                    except Exception as e:
+                        tile_file, file_size, error, cached = None, 0, str(e), False
+                    if error is None:
+                        tiles.append((x, y, tile_file))
+                        decode_futures[decoder.submit(paste_tile, x, y, tile_file)] = (x, y)
+                        if cached:
+                            gs.verbose(f"Reused cached tile {x},{y} ({file_size} bytes)")
+                        else:
+                            gs.verbose(f"Successfully downloaded tile {x},{y} ({file_size} bytes)")
+                    else:
+                        gs.warning(f"Tile {x},{y} failed - skipping ({error})")
+                    if done % PROGRESS_INTERVAL == 0 or done == len(futures):
+                        gs.message(f"Fetched {done}/{len(futures)} tiles")
+                http.clear()
+
+                decoded = 0
+                for future in as_completed(decode_futures):
+                    try:
+                        future.result()
+                        decoded += 1
+                    except Exception as e:
+                        x, y = decode_futures[future]
+                        gs.warning(f"Failed to decode tile {x},{y}: {e}")
+            except BaseException:
+                # Ctrl-C or an error: drop queued downloads and decodes
+                # instead of working through all of them before exiting
+                executor.shutdown(wait=False, cancel_futures=True)
+                decoder.shutdown(wait=False, cancel_futures=True)
+                raise
+
+        if not tiles:
+            gs.fatal("No tiles were downloaded successfully")
+        if not decoded:
+            gs.fatal("None of the downloaded tiles could be decoded")
+        if sidecar_failures:
+            gs.warning(f"Could not store cache metadata for {len(sidecar_failures)} "
+                       f"tiles in {cache_dir}; they will be downloaded again "
+                       "once they expire")
+        
+        gs.message(f"Downloaded {len(tiles)} tiles, decoded {decoded}")
+
+        try:
+            mosaic.FlushCache()
+            mosaic = None  # Close the GeoTIFF before importing it
+        except RuntimeError as e:
+            gs.fatal(f"Failed to write tile mosaic: {e}")
+
+        # Import the mosaic into GRASS using r.import, which reprojects the
         # Web Mercator tiles into the current location's CRS
         try:
-            gs.run_command('r.import', input=final_vrt, output=output, overwrite=True)
+            gs.run_command('r.import', input=mosaic_file, output=output, overwrite=True)
         except:
-            gs.fatal("Failed to import VRT into GRASS. r.import may not be available.")
+            gs.fatal("Failed to import tile mosaic into GRASS. r.import may not be available.")
         
-        gs.message(f"Successfully created raster map '{output}' from {len(tile_files)} tiles")
+        gs.message(f"Successfully created raster map '{output}' from {decoded} tiles")
         
     finally:
         # Clean up temporary files
-        import shutil
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        mosaic = None
+        if mosaic_file and os.path.exists(mosaic_file):
+            os.remove(mosaic_file)
+        if temp_dir:
+            remove_tile_dir(temp_dir)
 
 def download_wms_tiles(url_template, bbox, output, maxcols, maxrows, srs, format):
     """Download WMS tiles using GRASS r.in.wms"""
@@ -713,6 +998,10 @@ def main():
     maxrows = int(options['maxrows'])
     srs = options['srs']
     format = options['format']
+    workers = int(options['workers'])
+    cache_dir = None
+    if flags['k']:
+        cache_dir = options['cache_dir'] or default_cache_dir()
     
     # Get URL and server type
     if url:
@@ -720,6 +1009,7 @@ def main():
         tile_url = url
         server_name = "Custom"
         server_type = "xyz"  # Assume XYZ for custom URLs
+        server_id = "custom_" + hashlib.sha1(url.encode()).hexdigest()[:12]
     else:
         # Use predefined server
         if server not in WEB_MAP_SERVERS:
@@ -729,14 +1019,20 @@ def main():
         tile_url = server_info['url']
         server_name = server_info['name']
         server_type = server_info['type']
+        server_id = server
+    
+    # Keep tiles of each server in their own cache subdirectory
+    if cache_dir:
+        cache_dir = os.path.join(cache_dir, server_id)
     
     # Get bounding box
+    region = gs.region()
     if flags['c']:
-        bbox = get_region_bounds()
+        bbox = get_region_bounds(region)
     else:
         # Use default region or prompt user
         gs.message("Using current computational region...")
-        bbox = get_region_bounds()
+        bbox = get_region_bounds(region)
     
     gs.message(f"Downloading from {server_name}")
     gs.message(f"Output: {output}")
@@ -747,7 +1043,8 @@ def main():
     if server_type.lower() == 'wms':
         download_wms_tiles(tile_url, bbox, output, maxcols, maxrows, srs, format)
     else:
-        download_xyz_tiles(tile_url, bbox, output, maxcols, maxrows, srs, format)
+        download_xyz_tiles(tile_url, bbox, output, maxcols, maxrows, srs, format,
+                           workers=workers, region=region, cache_dir=cache_dir)
 
     # If the import produced separate red/green/blue band maps, by default
     # merge them into a single composite map named after the output basename